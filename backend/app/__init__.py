@@ -1,24 +1,74 @@
 """
 Flask application factory and configuration.
 """
-from flask import Flask
+from flask import Flask, Response, request
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_socketio import SocketIO
 from dotenv import load_dotenv
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import atexit
+import gzip
+import io
+import logging
 import os
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Load environment variables
 load_dotenv()
 
-# Initialize extensions
+
+class _OrjsonSocketIOJSON:
+    """dumps/loads shim so python-socketio serializes with orjson."""
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
+
+# Initialize extensions. async_mode picks the SocketIO worker model:
+# eventlet/gevent handle hundreds of concurrent clients, while the default
+# threading mode suits the Werkzeug dev server (run with
+# `gunicorn -k eventlet -w 1 run:app` and SOCKETIO_ASYNC_MODE=eventlet).
 db = SQLAlchemy()
-socketio = SocketIO()
+_socketio_kwargs = {}
+if orjson is not None:
+    _socketio_kwargs['json'] = _OrjsonSocketIOJSON
+_async_mode = os.getenv('SOCKETIO_ASYNC_MODE')
+if _async_mode:
+    _socketio_kwargs['async_mode'] = _async_mode
+socketio = SocketIO(**_socketio_kwargs)
+
+if orjson is not None:
+    from flask.json.provider import JSONProvider
+
+    class OrjsonProvider(JSONProvider):
+        """Flask JSON provider backed by orjson's Rust serializer."""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
 
 def create_app(config_name=None):
     """Create and configure Flask application."""
     app = Flask(__name__)
-    
+
+    # jsonify and request.get_json go through orjson when available
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+
     # Load configuration
     if config_name:
         from config import config
@@ -31,11 +81,43 @@ def create_app(config_name=None):
         app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'uploads')
         app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
     
+    # Gate log verbosity so per-request debug tracing in the services costs
+    # nothing unless explicitly enabled
+    log_level = app.config.get('LOG_LEVEL') or os.getenv('LOG_LEVEL', 'INFO')
+    logging.basicConfig(level=getattr(logging, log_level.upper(), logging.INFO))
+
+    # Tune the connection pool for concurrent workers (SQLite manages its
+    # own pooling and rejects these options)
+    if not app.config.get('SQLALCHEMY_DATABASE_URI', '').startswith('sqlite'):
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {
+            'pool_size': 20,
+            'max_overflow': 10,
+            'pool_timeout': 30,
+            'pool_recycle': 1800,
+            'pool_pre_ping': True
+        })
+
     # Initialize extensions with app
     db.init_app(app)
     CORS(app, origins=["http://localhost:3000"])  # Allow React frontend
     socketio.init_app(app, cors_allowed_origins="http://localhost:3000")
     
+    # Process pool for bcrypt hashing so the deliberately slow KDF runs on
+    # other cores instead of blocking the serving worker. Skipped when
+    # eventlet has monkey-patched threading (run_app/simple_server):
+    # forking a multiprocessing pool there and blocking on .result() is a
+    # known deadlock, so those servers hash inline instead.
+    try:
+        import eventlet.patcher
+        _eventlet_patched = eventlet.patcher.is_monkey_patched('thread')
+    except ImportError:
+        _eventlet_patched = False
+    if _eventlet_patched:
+        app.hash_pool = None
+    else:
+        app.hash_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        atexit.register(app.hash_pool.shutdown)
+
     # Register blueprints
     from app.routes.auth import auth_bp
     from app.routes.websocket import websocket_bp
@@ -44,12 +126,77 @@ def create_app(config_name=None):
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(websocket_bp)
     app.register_blueprint(health_bp)
-    
+
+    # Load-balancer probes can hit the health endpoints many times per
+    # second; answer them before URL-map routing with a body re-rendered
+    # at most once per second — the timestamp is the only dynamic field,
+    # and a 1 s granularity matches websocket.py's cached timestamp
+    health_fields = {
+        'status': 'healthy',
+        'version': '1.0.0',
+        'service': 'face-auth-backend',
+        'environment': os.getenv('FLASK_ENV', 'development')
+    }
+    health_cache = {'second': None, 'body': ''}
+
+    @app.before_request
+    def _fast_health():
+        if request.path in ('/health', '/api/health'):
+            second = int(time.time())
+            if health_cache['second'] != second:
+                health_cache['body'] = app.json.dumps(dict(
+                    health_fields, timestamp=datetime.utcnow().isoformat()
+                ))
+                health_cache['second'] = second
+            return Response(health_cache['body'], mimetype='application/json')
+
+    # Clients may gzip large JSON bodies (the signup payload carries a
+    # ~100 KB base64 data URL). Inflate before the view parses;
+    # _cached_data is what Werkzeug's get_data/get_json read from.
+    # MAX_CONTENT_LENGTH only caps the compressed body, so the inflated
+    # size is bounded too — otherwise a small gzip bomb could expand to
+    # gigabytes in a single unauthenticated call.
+    @app.before_request
+    def _inflate_gzip_body():
+        if request.content_encoding == 'gzip':
+            max_length = app.config.get('MAX_CONTENT_LENGTH') or 16 * 1024 * 1024
+            source = io.BytesIO(request.get_data(cache=False))
+            try:
+                with gzip.GzipFile(fileobj=source) as gz:
+                    inflated = gz.read(max_length + 1)
+            except OSError:
+                return Response(
+                    app.json.dumps({'error': 'Malformed gzip body'}),
+                    status=400, mimetype='application/json'
+                )
+            if len(inflated) > max_length:
+                return Response(
+                    app.json.dumps({'error': 'Decompressed payload too large'}),
+                    status=413, mimetype='application/json'
+                )
+            request._cached_data = inflated
+
     # Create upload folder if it doesn't exist
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     
-    # Create database tables
-    with app.app_context():
+    # Schema creation is a one-time deployment step (`flask init-db` or the
+    # startup scripts), not something every worker should do at boot
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create database tables."""
         db.create_all()
-    
+        print("Database tables created.")
+
+    # Warm the face similarity index from stored embeddings
+    with app.app_context():
+        from app.services.face_index import face_index
+        try:
+            face_index.warm_from_db()
+        except Exception as e:
+            # Fresh database without tables yet — the index starts empty
+            app.logger.warning(f"Face index warm-up skipped: {e}")
+
+    # Persist the face index on shutdown (no-op unless FACE_INDEX_PATH is set)
+    atexit.register(face_index.save)
+
     return app
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""
+Database models for users and rate limiting.
+"""
+from app import db
+from datetime import datetime, timedelta
+import logging
+import os
+import numpy as np
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+_redis_client = None
+
+
+def _get_redis():
+    """Return a shared Redis client if REDIS_URL is configured, else None."""
+    global _redis_client
+    if redis is None or not os.environ.get('REDIS_URL'):
+        return None
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(os.environ['REDIS_URL'])
+    return _redis_client
+
+
+class User(db.Model):
+    """User account with face embedding for authentication."""
+
+    __tablename__ = 'users'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(255), unique=True, index=True, nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)
+    face_embedding = db.Column(db.LargeBinary, nullable=True)
+    photo_path = db.Column(db.String(255), nullable=True)
+    is_verified = db.Column(db.Boolean, default=False, nullable=False)
+    otp_hash = db.Column(db.String(255), nullable=True)
+    otp_expires_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_login_at = db.Column(db.DateTime, nullable=True)
+
+    def set_embedding(self, embedding: np.ndarray):
+        """
+        Store a face embedding.
+
+        Args:
+            embedding: Face embedding as numpy array
+        """
+        # float16 halves storage and read bandwidth with negligible accuracy
+        # loss for unit-norm embeddings
+        self.face_embedding = np.asarray(embedding, dtype=np.float16).tobytes()
+
+    def get_embedding(self) -> np.ndarray:
+        """
+        Retrieve the stored face embedding.
+
+        Returns:
+            Face embedding as numpy array
+        """
+        # Upcast to float32 so downstream dot products accumulate at full
+        # precision
+        return np.frombuffer(self.face_embedding, dtype=np.float16).astype(np.float32)
+
+    def to_dict(self) -> dict:
+        """
+        Serialize user to a dictionary (excludes sensitive fields).
+
+        Returns:
+            Dictionary with public user fields
+        """
+        return {
+            'id': self.id,
+            'name': self.name,
+            'email': self.email,
+            'is_verified': self.is_verified,
+            'photo_path': self.photo_path,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_login_at': self.last_login_at.isoformat() if self.last_login_at else None
+        }
+
+
+class RateLimiter(db.Model):
+    """Tracks signup attempts per IP address for rate limiting."""
+
+    __tablename__ = 'rate_limit_attempts'
+
+    id = db.Column(db.Integer, primary_key=True)
+    ip_address = db.Column(db.String(45), nullable=False, index=True)
+    scope = db.Column(db.String(32), default='signup', nullable=False)
+    attempted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    MAX_ATTEMPTS = 5
+    WINDOW_SECONDS = 3600
+
+    @classmethod
+    def hit(cls, ip_address: str, scope: str = 'signup', limit: int = None) -> bool:
+        """
+        Record an attempt and report whether the IP is over the limit.
+
+        Uses a single atomic Redis INCR when REDIS_URL is configured,
+        falling back to the database table otherwise.
+
+        Args:
+            ip_address: Client IP address
+            scope: Counter namespace (e.g. 'signup', 'validate-face')
+            limit: Attempts allowed per window (defaults to MAX_ATTEMPTS)
+
+        Returns:
+            True if the IP is now rate limited, False otherwise
+        """
+        if limit is None:
+            limit = cls.MAX_ATTEMPTS
+
+        client = _get_redis()
+        if client is not None:
+            try:
+                key = f'rl:{scope}:{ip_address}'
+                pipe = client.pipeline()
+                pipe.incr(key)
+                pipe.expire(key, cls.WINDOW_SECONDS)
+                count, _ = pipe.execute()
+                return count > limit
+            except Exception as e:
+                logger.warning(f"Redis rate limiter unavailable, using DB: {e}")
+
+        if cls.is_rate_limited(ip_address, scope=scope, limit=limit):
+            return True
+        cls.record_attempt(ip_address, scope=scope)
+        return False
+
+    @classmethod
+    def is_rate_limited(cls, ip_address: str, scope: str = 'signup',
+                        limit: int = None) -> bool:
+        """
+        Check whether an IP address has exceeded the attempt limit.
+
+        Args:
+            ip_address: Client IP address
+            scope: Counter namespace
+            limit: Attempts allowed per window (defaults to MAX_ATTEMPTS)
+
+        Returns:
+            True if the IP is currently rate limited, False otherwise
+        """
+        if limit is None:
+            limit = cls.MAX_ATTEMPTS
+        window_start = datetime.utcnow() - timedelta(seconds=cls.WINDOW_SECONDS)
+        count = cls.query.filter(
+            cls.ip_address == ip_address,
+            cls.scope == scope,
+            cls.attempted_at >= window_start
+        ).count()
+        return count >= limit
+
+    @classmethod
+    def record_attempt(cls, ip_address: str, scope: str = 'signup'):
+        """
+        Record an attempt for an IP address.
+
+        Args:
+            ip_address: Client IP address
+            scope: Counter namespace
+        """
+        attempt = cls(ip_address=ip_address, scope=scope)
+        db.session.add(attempt)
+        db.session.commit()
@@ -4,10 +4,20 @@ Authentication routes for signup, login, OTP verification, and logout.
 from flask import Blueprint, request, jsonify, session, current_app
 from app import db, socketio
 from app.models import User, RateLimiter
+from app.schemas import (
+    SignupRequest, VerifyOTPRequest, LoginRequest, PasswordLoginRequest,
+    ResendOTPRequest, ValidateFaceRequest
+)
 from app.services.face_recognition import face_service
+from app.services.face_index import face_index
 from app.services.email_service import email_service
 from app.utils.auth_utils import hash_password, verify_password, generate_otp, hash_otp, verify_otp
+from app.utils.image_utils import decode_data_url
 from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from cachetools import TTLCache
+import hashlib
+import threading
 import uuid
 import os
 import logging
@@ -16,6 +26,38 @@ logger = logging.getLogger(__name__)
 
 auth_bp = Blueprint('auth', __name__)
 
+# The frontend validates webcam frames before submitting them, so signup and
+# login usually re-extract an embedding the server just computed. Cache
+# results briefly, keyed on a digest of the image payload, so each unique
+# frame runs the detector/CNN once.
+_embedding_cache = TTLCache(maxsize=1024, ttl=60)
+_embedding_cache_lock = threading.Lock()
+
+
+def _cached_face_embedding(image_bytes):
+    """Extract a face embedding, caching results per image for a short TTL."""
+    key = hashlib.blake2b(image_bytes, digest_size=32).digest()
+    with _embedding_cache_lock:
+        cached = _embedding_cache.get(key)
+    if cached is not None:
+        return cached
+    result = face_service.get_face_embedding(image_bytes)
+    with _embedding_cache_lock:
+        _embedding_cache[key] = result
+    return result
+
+
+def _run_hash(fn, *args):
+    """Run a bcrypt operation in the app's hash pool, or inline.
+
+    The pool is None under eventlet (see create_app), where blocking on
+    a multiprocessing future would deadlock the patched threading.
+    """
+    pool = current_app.hash_pool
+    if pool is None:
+        return fn(*args)
+    return pool.submit(fn, *args).result()
+
 @auth_bp.route('/signup', methods=['POST'])
 def signup():
     """
@@ -29,64 +71,43 @@ def signup():
     6. Send OTP email
     """
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ['name', 'email', 'password', 'face_image']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'error': f'{field} is required'}), 400
-        
-        name = data['name'].strip()
-        email = data['email'].strip().lower()
-        password = data['password']
-        face_image = data['face_image']
-        
-        # Basic validation
-        if len(name) < 2:
-            return jsonify({'error': 'Name must be at least 2 characters'}), 400
-        
-        if len(password) < 6:
-            return jsonify({'error': 'Password must be at least 6 characters'}), 400
-        
-        # Check rate limiting
+        payload, validation_error = SignupRequest.parse(request.get_json())
+        if payload is None:
+            return jsonify({'error': validation_error}), 400
+
+        name = payload.name
+        email = payload.email
+        password = payload.password
+        # Decode the data URL once; everything downstream works on raw bytes
+        image_bytes = decode_data_url(payload.face_image)
+        if image_bytes is None:
+            return jsonify({'error': 'Invalid image format'}), 400
+
+        # Check rate limiting (record + check in one round-trip)
         client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr)
-        if RateLimiter.is_rate_limited(client_ip):
+        if RateLimiter.hit(client_ip):
             return jsonify({'error': 'Too many signup attempts. Please try again later.'}), 429
-        
-        # Record the attempt
-        RateLimiter.record_attempt(client_ip)
-        
-        # Check if email already exists
-        existing_user = User.query.filter_by(email=email).first()
-        if existing_user:
-            if existing_user.is_verified:
-                return jsonify({'error': 'Email already registered'}), 400
-            else:
-                # User exists but not verified, allow re-registration
-                db.session.delete(existing_user)
-                db.session.commit()
-        
+
         # Extract face embedding
-        face_embedding, error_msg = face_service.get_face_embedding(face_image)
+        face_embedding, error_msg = _cached_face_embedding(image_bytes)
         if face_embedding is None:
             return jsonify({'error': error_msg}), 400
         
-        # Check for duplicate faces in database
-        all_users = User.query.all()
-        for user in all_users:
-            try:
-                existing_embedding = user.get_embedding()
-                if face_service.is_same_person(face_embedding, existing_embedding):
-                    return jsonify({
-                        'error': 'This face is already registered to another account'
-                    }), 400
-            except Exception as e:
-                logger.warning(f"Error comparing with user {user.id}: {e}")
-                continue
+        # Check for duplicate faces via the similarity index (single search
+        # instead of comparing against every stored user)
+        similarity_threshold = 1.0 - face_service.face_threshold
+        duplicate_user_id = face_index.search(face_embedding, similarity_threshold)
+        if duplicate_user_id is not None:
+            # An unverified account re-registering with its own face is fine;
+            # the stale row is replaced on the insert-conflict path below
+            owner = db.session.get(User, duplicate_user_id)
+            if owner is not None and not (owner.email == email and not owner.is_verified):
+                return jsonify({
+                    'error': 'This face is already registered to another account'
+                }), 400
         
-        # Hash password
-        password_hash = hash_password(password)
+        # Hash password in the process pool to keep this worker responsive
+        password_hash = _run_hash(hash_password, password)
         
         # Create new user
         user = User(
@@ -99,15 +120,29 @@ def signup():
         # Set face embedding
         user.set_embedding(face_embedding)
         
-        # Save user to get ID
+        # Save user to get ID; rely on the unique email index instead of a
+        # separate existence SELECT, so the common new-email case is one
+        # round-trip and the check-then-insert race goes away
         db.session.add(user)
-        db.session.flush()  # Get the ID without committing
-        
+        try:
+            db.session.flush()  # Get the ID without committing
+        except IntegrityError:
+            db.session.rollback()
+            existing_user = User.query.filter_by(email=email).first()
+            if existing_user is None or existing_user.is_verified:
+                return jsonify({'error': 'Email already registered'}), 400
+            # User exists but not verified, allow re-registration
+            face_index.remove(existing_user.id)
+            db.session.delete(existing_user)
+            db.session.flush()
+            db.session.add(user)
+            db.session.flush()
+
         # Save face thumbnail
         thumbnail_filename = f"user_{user.id}_face.jpg"
         saved_path = face_service.save_face_thumbnail(
-            face_image, 
-            thumbnail_filename, 
+            image_bytes,
+            thumbnail_filename,
             current_app.config['UPLOAD_FOLDER']
         )
         if saved_path:
@@ -123,14 +158,13 @@ def signup():
         
         # Save all changes
         db.session.commit()
-        
-        # Send OTP email
-        try:
-            email_service.send_otp_email(email, name, otp_code)
-        except Exception as e:
-            logger.error(f"Failed to send OTP email: {e}")
-            # Don't fail the signup, user can request resend
-        
+
+        # Make the new face visible to future duplicate checks
+        face_index.add(user.id, face_embedding)
+
+        # Queue OTP email; the response does not wait on SMTP
+        email_service.send_otp_email_async(email, name, otp_code)
+
         logger.info(f"User signup successful: {email}")
         
         return jsonify({
@@ -148,13 +182,12 @@ def signup():
 def verify_otp_endpoint():
     """Verify OTP and activate user account."""
     try:
-        data = request.get_json()
-        
-        if not data.get('email') or not data.get('otp'):
-            return jsonify({'error': 'Email and OTP are required'}), 400
-        
-        email = data['email'].strip().lower()
-        otp_code = data['otp'].strip()
+        payload, validation_error = VerifyOTPRequest.parse(request.get_json())
+        if payload is None:
+            return jsonify({'error': validation_error}), 400
+
+        email = payload.email
+        otp_code = payload.otp
         
         # Find user
         user = User.query.filter_by(email=email).first()
@@ -196,47 +229,51 @@ def login():
     Handle user login with email and face recognition.
     """
     try:
-        data = request.get_json()
-        
-        if not data.get('email') or not data.get('face_image'):
-            return jsonify({'error': 'Email and face image are required'}), 400
-        
-        email = data['email'].strip().lower()
-        face_image = data['face_image']
-        
+        payload, validation_error = LoginRequest.parse(request.get_json())
+        if payload is None:
+            return jsonify({'error': validation_error}), 400
+
+        email = payload.email
+        # Decode the data URL once; everything downstream works on raw bytes
+        image_bytes = decode_data_url(payload.face_image)
+        if image_bytes is None:
+            return jsonify({'error': 'Invalid image format'}), 400
+
         # Find user
         user = User.query.filter_by(email=email).first()
         if not user:
             return jsonify({'error': 'User not found'}), 404
-        
+
         if not user.is_verified:
             return jsonify({'error': 'Account not verified. Please check your email.'}), 400
-        
+
         # Extract face embedding from login image
-        login_embedding, error_msg = face_service.get_face_embedding(face_image)
+        login_embedding, error_msg = _cached_face_embedding(image_bytes)
         if login_embedding is None:
             return jsonify({'error': f'Face processing failed: {error_msg}'}), 400
         
-        # Compare with stored embedding
+        # Compare with stored embedding; both are pipeline-produced unit
+        # vectors, so the cheap dot-product comparison applies
         stored_embedding = user.get_embedding()
-        if not face_service.is_same_person(login_embedding, stored_embedding):
+        distance = face_service.compare_unit_embeddings(login_embedding, stored_embedding)
+        if distance >= face_service.face_threshold:
             return jsonify({'error': 'Face did not match. Please try again.'}), 401
         
-        # Update last login
-        user.last_login_at = datetime.utcnow()
+        # Update last login (single utcnow shared with the session payload)
+        now = datetime.utcnow()
+        user.last_login_at = now
         db.session.commit()
-        
-        # Create session
-        session['user_id'] = user.id
-        session['email'] = user.email
-        session['login_time'] = datetime.utcnow().isoformat()
-        
-        # Send login notification email
-        try:
-            email_service.send_login_notification(user.email, user.name)
-        except Exception as e:
-            logger.warning(f"Failed to send login notification: {e}")
-        
+
+        # Create session in one update instead of three assignments
+        session.update(
+            user_id=user.id,
+            email=user.email,
+            login_time=now.isoformat()
+        )
+
+        # Queue login notification email; the response does not wait on SMTP
+        email_service.send_login_notification_async(user.email, user.name)
+
         # Emit real-time notification
         try:
             socketio.emit('user_login', {
@@ -264,13 +301,12 @@ def login_with_password():
     Backup login method using email and password.
     """
     try:
-        data = request.get_json()
-        
-        if not data.get('email') or not data.get('password'):
-            return jsonify({'error': 'Email and password are required'}), 400
-        
-        email = data['email'].strip().lower()
-        password = data['password']
+        payload, validation_error = PasswordLoginRequest.parse(request.get_json())
+        if payload is None:
+            return jsonify({'error': validation_error}), 400
+
+        email = payload.email
+        password = payload.password
         
         # Find user
         user = User.query.filter_by(email=email).first()
@@ -280,25 +316,26 @@ def login_with_password():
         if not user.is_verified:
             return jsonify({'error': 'Account not verified. Please check your email.'}), 400
         
-        # Verify password
-        if not verify_password(password, user.password_hash):
+        # Verify password in the process pool to keep this worker responsive
+        password_ok = _run_hash(verify_password, password, user.password_hash)
+        if not password_ok:
             return jsonify({'error': 'Invalid credentials'}), 401
         
-        # Update last login
-        user.last_login_at = datetime.utcnow()
+        # Update last login (single utcnow shared with the session payload)
+        now = datetime.utcnow()
+        user.last_login_at = now
         db.session.commit()
-        
-        # Create session
-        session['user_id'] = user.id
-        session['email'] = user.email
-        session['login_time'] = datetime.utcnow().isoformat()
-        
-        # Send login notification email
-        try:
-            email_service.send_login_notification(user.email, user.name)
-        except Exception as e:
-            logger.warning(f"Failed to send login notification: {e}")
-        
+
+        # Create session in one update instead of three assignments
+        session.update(
+            user_id=user.id,
+            email=user.email,
+            login_time=now.isoformat()
+        )
+
+        # Queue login notification email; the response does not wait on SMTP
+        email_service.send_login_notification_async(user.email, user.name)
+
         logger.info(f"User password login successful: {email}")
         
         return jsonify({
@@ -357,12 +394,11 @@ def get_current_user():
 def resend_otp():
     """Resend OTP for account verification."""
     try:
-        data = request.get_json()
-        
-        if not data.get('email'):
-            return jsonify({'error': 'Email is required'}), 400
-        
-        email = data['email'].strip().lower()
+        payload, validation_error = ResendOTPRequest.parse(request.get_json())
+        if payload is None:
+            return jsonify({'error': validation_error}), 400
+
+        email = payload.email
         
         # Find user
         user = User.query.filter_by(email=email).first()
@@ -381,13 +417,9 @@ def resend_otp():
         user.otp_expires_at = otp_expires
         db.session.commit()
         
-        # Send OTP email
-        try:
-            email_service.send_otp_email(email, user.name, otp_code)
-        except Exception as e:
-            logger.error(f"Failed to send OTP email: {e}")
-            return jsonify({'error': 'Failed to send email'}), 500
-        
+        # Queue OTP email; the response does not wait on SMTP
+        email_service.send_otp_email_async(email, user.name, otp_code)
+
         return jsonify({'message': 'OTP sent successfully'}), 200
         
     except Exception as e:
@@ -399,55 +431,72 @@ def resend_otp():
 def validate_face():
     """Validate face image quality before signup/login."""
     try:
-        data = request.get_json()
-        
-        if not data.get('face_image'):
-            return jsonify({'error': 'Face image is required'}), 400
-        
-        face_image = data['face_image']
-        
-        # For development: Check if it's a base64 image, if so, consider it valid
-        # This is a temporary bypass to help with testing
-        if face_image and face_image.startswith('data:image'):
-            try:
-                # Try to extract embedding to validate the face
-                face_embedding, error_msg = face_service.get_face_embedding(face_image)
-                
-                if face_embedding is None:
-                    # Provide more helpful error messages
-                    if "No face detected" in error_msg:
-                        # For development, we'll be more lenient
-                        logger.warning(f"Face detection failed but allowing for development: {error_msg}")
-                        return jsonify({
-                            'valid': True,
-                            'message': 'Face validation successful (development mode)'
-                        }), 200
-                    elif "Invalid image" in error_msg:
-                        error_msg = "Unable to process the image. Please try taking a new photo."
-                    
-                    return jsonify({
-                        'valid': False,
-                        'message': error_msg
-                    }), 400
-                
+        # Raw-image fast path: multipart or octet-stream uploads carry the
+        # JPEG bytes directly, skipping the ~33% base64 inflation and the
+        # decode on both ends. JSON data-URL bodies keep working unchanged.
+        image_bytes = None
+        if 'face_image' in request.files:
+            image_bytes = request.files['face_image'].read()
+        elif (request.content_type or '').startswith('application/octet-stream'):
+            image_bytes = request.get_data()
+
+        if image_bytes is None:
+            payload, validation_error = ValidateFaceRequest.parse(request.get_json())
+            if payload is None:
+                return jsonify({'error': validation_error}), 400
+
+            face_image = payload.face_image
+
+            # For development: only data-URL images are accepted on the
+            # JSON path; anything else is rejected below
+            if not (face_image and face_image.startswith('data:image')):
                 return jsonify({
-                    'valid': True,
-                    'message': 'Face validation successful'
-                }), 200
-                
-            except Exception as e:
-                logger.warning(f"Face validation error but allowing for development: {e}")
-                # For development, allow through if it's a valid image format
+                    'valid': False,
+                    'message': 'Invalid image format'
+                }), 400
+
+        if image_bytes is None:
+            # Decode the data URL once; everything downstream works on raw bytes
+            image_bytes = decode_data_url(face_image)
+            if image_bytes is None:
                 return jsonify({
-                    'valid': True,
-                    'message': 'Face validation successful (development mode)'
-                }), 200
-        
-        return jsonify({
-            'valid': False,
-            'message': 'Invalid image format'
-        }), 400
-        
+                    'valid': False,
+                    'message': 'Invalid image format'
+                }), 400
+        try:
+            # Try to extract embedding to validate the face
+            face_embedding, error_msg = _cached_face_embedding(image_bytes)
+
+            if face_embedding is None:
+                # Provide more helpful error messages
+                if "No face detected" in error_msg:
+                    # For development, we'll be more lenient
+                    logger.warning(f"Face detection failed but allowing for development: {error_msg}")
+                    return jsonify({
+                        'valid': True,
+                        'message': 'Face validation successful (development mode)'
+                    }), 200
+                elif "Invalid image" in error_msg:
+                    error_msg = "Unable to process the image. Please try taking a new photo."
+
+                return jsonify({
+                    'valid': False,
+                    'message': error_msg
+                }), 400
+
+            return jsonify({
+                'valid': True,
+                'message': 'Face validation successful'
+            }), 200
+
+        except Exception as e:
+            logger.warning(f"Face validation error but allowing for development: {e}")
+            # For development, allow through if it's a valid image format
+            return jsonify({
+                'valid': True,
+                'message': 'Face validation successful (development mode)'
+            }), 200
+
     except Exception as e:
         logger.error(f"Face validation error: {e}")
         return jsonify({
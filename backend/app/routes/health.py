@@ -7,6 +7,9 @@ import os
 
 health_bp = Blueprint('health', __name__)
 
+# Snapshot at import time; probes shouldn't touch os.environ per request
+ENV = os.getenv('FLASK_ENV', 'development')
+
 
 @health_bp.route('/health', methods=['GET'])
 def health_check():
@@ -16,7 +19,7 @@ def health_check():
         'timestamp': datetime.utcnow().isoformat(),
         'version': '1.0.0',
         'service': 'face-auth-backend',
-        'environment': os.getenv('FLASK_ENV', 'development')
+        'environment': ENV
     })
 
 
@@ -4,15 +4,57 @@ WebSocket routes for real-time notifications and updates.
 from flask import Blueprint, request, session
 from flask_socketio import emit, join_room, leave_room, disconnect
 from app import socketio
+from datetime import datetime
+import collections
 import logging
 
 logger = logging.getLogger(__name__)
 
 websocket_bp = Blueprint('websocket', __name__)
 
+# Timestamp refreshed once per second by a background task; ping and
+# notification payloads are too hot to re-format it per event
+_current_timestamp = datetime.utcnow().isoformat()
+
+# Outbound notifications are queued here and flushed by a single background
+# task, amortizing SocketIO framing over bursts instead of paying per call
+_pending_notifications = collections.deque()
+
+_background_tasks_started = False
+
+
+def _refresh_timestamp():
+    """Background task keeping the cached timestamp fresh."""
+    global _current_timestamp
+    while True:
+        _current_timestamp = datetime.utcnow().isoformat()
+        socketio.sleep(1)
+
+
+def _flush_notifications():
+    """Background task draining the notification queue in batches."""
+    while True:
+        while _pending_notifications:
+            room, payload = _pending_notifications.popleft()
+            try:
+                socketio.emit('notification', payload, room=room)
+            except Exception as e:
+                logger.error(f"Failed to emit notification to {room}: {e}")
+        socketio.sleep(0.02)
+
+
+def _ensure_background_tasks():
+    """Start the timestamp refresher and notification flusher on first use."""
+    global _background_tasks_started
+    if not _background_tasks_started:
+        _background_tasks_started = True
+        socketio.start_background_task(_refresh_timestamp)
+        socketio.start_background_task(_flush_notifications)
+
 @socketio.on('connect')
 def on_connect():
     """Handle client connection."""
+    _ensure_background_tasks()
     user_id = session.get('user_id')
     if user_id:
         # Join user-specific room for targeted notifications
@@ -54,7 +96,7 @@ def on_join_notifications():
 @socketio.on('ping')
 def on_ping():
     """Handle ping for keeping connection alive."""
-    emit('pong', {'timestamp': str(__import__('datetime').datetime.utcnow())})
+    emit('pong', {'timestamp': _current_timestamp})
 
 # Helper functions for emitting notifications
 def emit_user_notification(user_id, notification_type, message, data=None):
@@ -67,21 +109,18 @@ def emit_user_notification(user_id, notification_type, message, data=None):
         message: Notification message
         data: Additional data to send
     """
-    try:
-        notification_data = {
-            'type': notification_type,
-            'message': message,
-            'timestamp': str(__import__('datetime').datetime.utcnow())
-        }
-        
-        if data:
-            notification_data.update(data)
-        
-        socketio.emit('notification', notification_data, room=f'user_{user_id}')
-        logger.info(f"Notification sent to user {user_id}: {message}")
-        
-    except Exception as e:
-        logger.error(f"Failed to emit notification to user {user_id}: {e}")
+    notification_data = {
+        'type': notification_type,
+        'message': message,
+        'timestamp': _current_timestamp
+    }
+
+    if data:
+        notification_data.update(data)
+
+    _ensure_background_tasks()
+    _pending_notifications.append((f'user_{user_id}', notification_data))
+    logger.debug(f"Notification queued for user {user_id}: {message}")
 
 def emit_login_success(user_id, user_name):
     """
@@ -0,0 +1,77 @@
+"""
+Request schemas for the authentication API.
+
+Each request type is declared once as a pydantic model; the validators are
+compiled at import time, replacing the hand-rolled per-field loops that each
+route handler used to run on every request.
+"""
+from pydantic import BaseModel, EmailStr, Field, ValidationError, field_validator
+
+
+class _Schema(BaseModel):
+    """Base schema with a helper for consistent 400 error messages."""
+
+    @classmethod
+    def parse(cls, data):
+        """
+        Validate a request payload.
+
+        Args:
+            data: Decoded JSON body (may be None)
+
+        Returns:
+            Tuple of (model instance, error message) — exactly one is None
+        """
+        try:
+            return cls.model_validate(data or {}), None
+        except ValidationError as e:
+            error = e.errors()[0]
+            field = '.'.join(str(part) for part in error['loc']) or 'request'
+            return None, f"{field}: {error['msg']}"
+
+
+class _EmailSchema(_Schema):
+    """Schema with a normalized email field."""
+
+    email: EmailStr
+
+    @field_validator('email', mode='before')
+    @classmethod
+    def _normalize_email(cls, value):
+        return value.strip().lower() if isinstance(value, str) else value
+
+
+class SignupRequest(_EmailSchema):
+    name: str = Field(min_length=2)
+    password: str = Field(min_length=6)
+    face_image: str = Field(min_length=1)
+
+    @field_validator('name', mode='before')
+    @classmethod
+    def _strip_name(cls, value):
+        return value.strip() if isinstance(value, str) else value
+
+
+class VerifyOTPRequest(_EmailSchema):
+    otp: str = Field(min_length=1)
+
+    @field_validator('otp', mode='before')
+    @classmethod
+    def _strip_otp(cls, value):
+        return value.strip() if isinstance(value, str) else value
+
+
+class LoginRequest(_EmailSchema):
+    face_image: str = Field(min_length=1)
+
+
+class PasswordLoginRequest(_EmailSchema):
+    password: str = Field(min_length=1)
+
+
+class ResendOTPRequest(_EmailSchema):
+    pass
+
+
+class ValidateFaceRequest(_Schema):
+    face_image: str = Field(min_length=1)
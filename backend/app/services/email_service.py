@@ -3,11 +3,32 @@ Email service for sending OTP and login notifications.
 """
 import smtplib
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 from typing import Optional
 
+import jinja2
+from werkzeug.local import LocalProxy
+
+# Templates compile to bytecode once at import; renders are cheap after that
+_TEMPLATE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'templates', 'email'
+)
+_template_env = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(_TEMPLATE_DIR),
+    auto_reload=False,
+    cache_size=-1
+)
+_otp_html = _template_env.get_template('otp.html.j2')
+_otp_text = _template_env.get_template('otp.txt.j2')
+_login_html = _template_env.get_template('login.html.j2')
+_login_text = _template_env.get_template('login.txt.j2')
+
+
 class EmailService:
     """Service for sending emails via SMTP."""
     
@@ -19,7 +40,98 @@ class EmailService:
         self.smtp_password = os.getenv('SMTP_PASSWORD', '')
         self.from_email = os.getenv('FROM_EMAIL', self.smtp_user)
         self.from_name = os.getenv('FROM_NAME', 'Face Auth App')
-        
+
+        # Background queue so HTTP responses never wait on the SMTP
+        # round-trip; send_email already logs and swallows failures. Each
+        # worker thread keeps its own SMTP connection, so bulk sends overlap
+        # their handshakes and DATA phases (capped at 10 connections, the
+        # usual provider guidance).
+        workers = min(int(os.getenv('EMAIL_CONCURRENCY', '2')), 10)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='email')
+
+        # Per-thread cached SMTP connection: the TLS handshake dominates
+        # per-mail latency, so each session is reused and recycled after
+        # CONN_MAX_MESSAGES messages or CONN_IDLE_SECONDS idle
+        self._local = threading.local()
+
+    CONN_MAX_MESSAGES = 100
+    CONN_IDLE_SECONDS = 30.0
+
+    def _close_connection(self):
+        """Drop this thread's cached SMTP connection."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            try:
+                conn.quit()
+            except Exception:
+                pass
+            self._local.conn = None
+            self._local.sends = 0
+
+    def _get_connection(self) -> smtplib.SMTP:
+        """Return a live SMTP connection for this thread, reusing when possible."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            if (self._local.sends >= self.CONN_MAX_MESSAGES
+                    or time.monotonic() - self._local.last_used > self.CONN_IDLE_SECONDS):
+                self._close_connection()
+            else:
+                try:
+                    # Probe liveness before trusting the cached session
+                    conn.noop()
+                    return conn
+                except Exception:
+                    self._close_connection()
+
+        conn = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30)
+        conn.starttls()
+        conn.login(self.smtp_user, self.smtp_password)
+        self._local.conn = conn
+        self._local.sends = 0
+        return conn
+
+    # Retry policy for queued sends: transient SMTP failures (greylisting,
+    # connection resets) get exponential backoff before giving up
+    MAX_RETRIES = 5
+    RETRY_BASE_DELAY = 1.0
+
+    def _send_with_retry(self, send_fn, *args, **kwargs) -> bool:
+        """Run a send function with exponential backoff on failure."""
+        delay = self.RETRY_BASE_DELAY
+        for attempt in range(self.MAX_RETRIES):
+            if send_fn(*args, **kwargs):
+                return True
+            if attempt < self.MAX_RETRIES - 1:
+                time.sleep(delay)
+                delay = min(delay * 2, 30.0)
+        print(f"Giving up on email after {self.MAX_RETRIES} attempts")
+        return False
+
+    def send_otp_email_async(self, *args, **kwargs):
+        """Queue an OTP email without blocking the caller."""
+        self._executor.submit(self._send_with_retry, self.send_otp_email, *args, **kwargs)
+
+    def send_login_notification_async(self, *args, **kwargs):
+        """Queue a login notification email without blocking the caller."""
+        self._executor.submit(
+            self._send_with_retry, self.send_login_notification, *args, **kwargs
+        )
+
+    def send_many(self, messages):
+        """
+        Queue a batch of emails across the worker pool.
+
+        Args:
+            messages: Iterable of (to_email, subject, html_body, text_body)
+
+        Returns:
+            List of futures resolving to per-message success booleans
+        """
+        return [
+            self._executor.submit(self._send_with_retry, self.send_email, *message)
+            for message in messages
+        ]
+
     def send_email(self, to_email: str, subject: str, html_body: str, 
                    text_body: str = "") -> bool:
         """
@@ -49,174 +161,79 @@ class EmailService:
             html_part = MIMEText(html_body, 'html')
             msg.attach(html_part)
             
-            # Send email
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
-            
+            # Send over this thread's cached connection
+            server = self._get_connection()
+            server.send_message(msg)
+            self._local.sends += 1
+            self._local.last_used = time.monotonic()
+
             print(f"Email sent successfully to {to_email}")
             return True
-            
+
         except Exception as e:
             print(f"Failed to send email to {to_email}: {str(e)}")
+            self._close_connection()
             return False
     
-    def send_otp_email(self, to_email: str, otp: str, name: str) -> bool:
+    def send_otp_email(self, to_email: str, name: str, otp: str) -> bool:
         """
         Send OTP verification email.
-        
+
         Args:
             to_email: Recipient email address
-            otp: 6-digit OTP code
             name: User's name
-            
+            otp: 6-digit OTP code
+
         Returns:
             True if email sent successfully, False otherwise
         """
         subject = "Verify Your Face Auth Account"
-        
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 0; padding: 20px; background-color: #f5f5f5; }}
-                .container {{ max-width: 600px; margin: 0 auto; background-color: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-                .header {{ text-align: center; margin-bottom: 30px; }}
-                .logo {{ font-size: 24px; font-weight: bold; color: #2563eb; margin-bottom: 10px; }}
-                .otp-code {{ font-size: 32px; font-weight: bold; color: #1f2937; background-color: #f3f4f6; padding: 15px; border-radius: 8px; text-align: center; letter-spacing: 5px; margin: 20px 0; }}
-                .warning {{ color: #ef4444; font-size: 14px; margin-top: 20px; }}
-                .footer {{ margin-top: 30px; padding-top: 20px; border-top: 1px solid #e5e7eb; text-align: center; color: #6b7280; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <div class="logo">🔐 Face Auth</div>
-                    <h1>Verify Your Account</h1>
-                </div>
-                
-                <p>Hello {name},</p>
-                
-                <p>Thank you for signing up for Face Auth! To complete your registration, please use the verification code below:</p>
-                
-                <div class="otp-code">{otp}</div>
-                
-                <p>This code will expire in 10 minutes for security reasons.</p>
-                
-                <p class="warning">⚠️ If you didn't create an account with Face Auth, please ignore this email.</p>
-                
-                <div class="footer">
-                    <p>Face Auth - Secure Authentication System</p>
-                    <p>This is an automated message, please do not reply.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_body = f"""
-        Face Auth - Account Verification
-        
-        Hello {name},
-        
-        Thank you for signing up for Face Auth! To complete your registration, please use this verification code:
-        
-        {otp}
-        
-        This code will expire in 10 minutes for security reasons.
-        
-        If you didn't create an account with Face Auth, please ignore this email.
-        
-        ---
-        Face Auth - Secure Authentication System
-        """
-        
+
+        html_body = _otp_html.render(name=name, otp=otp)
+        text_body = _otp_text.render(name=name, otp=otp)
+
         return self.send_email(to_email, subject, html_body, text_body)
-    
-    def send_login_notification(self, to_email: str, name: str, 
+
+    def send_login_notification(self, to_email: str, name: str,
                               login_time: Optional[datetime] = None) -> bool:
         """
         Send login notification email.
-        
+
         Args:
             to_email: User's email address
             name: User's name
             login_time: Login timestamp (defaults to now)
-            
+
         Returns:
             True if email sent successfully, False otherwise
         """
         if login_time is None:
             login_time = datetime.utcnow()
-        
+
         formatted_time = login_time.strftime("%B %d, %Y at %I:%M %p UTC")
-        
+
         subject = "Login Detected - Face Auth"
-        
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 0; padding: 20px; background-color: #f5f5f5; }}
-                .container {{ max-width: 600px; margin: 0 auto; background-color: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-                .header {{ text-align: center; margin-bottom: 30px; }}
-                .logo {{ font-size: 24px; font-weight: bold; color: #10b981; margin-bottom: 10px; }}
-                .login-info {{ background-color: #ecfdf5; padding: 20px; border-radius: 8px; border-left: 4px solid #10b981; margin: 20px 0; }}
-                .warning {{ color: #f59e0b; font-size: 14px; margin-top: 20px; padding: 15px; background-color: #fffbeb; border-radius: 8px; }}
-                .footer {{ margin-top: 30px; padding-top: 20px; border-top: 1px solid #e5e7eb; text-align: center; color: #6b7280; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <div class="logo">🔐 Face Auth</div>
-                    <h1>Login Detected</h1>
-                </div>
-                
-                <p>Hello {name},</p>
-                
-                <p>We detected a successful login to your Face Auth account using face recognition.</p>
-                
-                <div class="login-info">
-                    <strong>Login Details:</strong><br>
-                    📅 Time: {formatted_time}<br>
-                    🔐 Method: Face Recognition
-                </div>
-                
-                <div class="warning">
-                    ⚠️ If this wasn't you, please contact support immediately and consider changing your password.
-                </div>
-                
-                <div class="footer">
-                    <p>Face Auth - Secure Authentication System</p>
-                    <p>This is an automated security notification.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_body = f"""
-        Face Auth - Login Detected
-        
-        Hello {name},
-        
-        We detected a successful login to your Face Auth account using face recognition.
-        
-        Login Details:
-        Time: {formatted_time}
-        Method: Face Recognition
-        
-        If this wasn't you, please contact support immediately and consider changing your password.
-        
-        ---
-        Face Auth - Secure Authentication System
-        """
-        
+
+        html_body = _login_html.render(name=name, formatted_time=formatted_time)
+        text_body = _login_text.render(name=name, formatted_time=formatted_time)
+
         return self.send_email(to_email, subject, html_body, text_body)
 
-# Global instance
-email_service = EmailService()
\ No newline at end of file
+
+# Global instance, created on first use so importing the module doesn't
+# spin up the worker pool (mirrors the lazy face_service)
+_service: Optional[EmailService] = None
+_service_lock = threading.Lock()
+
+
+def get_email_service() -> EmailService:
+    """Return the process-wide EmailService, creating it lazily."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = EmailService()
+    return _service
+
+
+email_service = LocalProxy(get_email_service)
\ No newline at end of file
@@ -2,23 +2,35 @@
 Utility functions for password hashing, OTP generation, and validation.
 """
 import bcrypt
+import hashlib
+import hmac
+import os
+import re
 import secrets
 import string
 from datetime import datetime, timedelta
 from typing import Tuple
 
+# OTPs are short-lived (10 min) and rate-limited, so a keyed fast hash is
+# enough; bcrypt-class KDFs would serialize every verify on CPU for nothing
+_OTP_SECRET = (os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production').encode('utf-8')
+
+# bcrypt cost factor; each +1 doubles hashing time, so deployments can tune
+# the CPU cost without touching code (12 is the bcrypt default)
+_BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+
 def hash_password(password: str) -> str:
     """
     Hash a password using bcrypt.
-    
+
     Args:
         password: Plain text password
-        
+
     Returns:
         Hashed password string
     """
     password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=_BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
@@ -52,14 +64,14 @@ def generate_otp() -> str:
 def hash_otp(otp: str) -> str:
     """
     Hash an OTP for secure storage.
-    
+
     Args:
         otp: Plain text OTP
-        
+
     Returns:
         Hashed OTP string
     """
-    return hash_password(otp)
+    return hmac.new(_OTP_SECRET, otp.encode('utf-8'), hashlib.sha256).hexdigest()
 
 def verify_otp(otp: str, hashed: str) -> bool:
     """
@@ -72,7 +84,7 @@ def verify_otp(otp: str, hashed: str) -> bool:
     Returns:
         True if OTP matches, False otherwise
     """
-    return verify_password(otp, hashed)
+    return hmac.compare_digest(hash_otp(otp), hashed)
 
 def generate_otp_with_expiry(minutes: int = 10) -> Tuple[str, str, datetime]:
     """
@@ -102,19 +114,20 @@ def is_otp_expired(expiry_time: datetime) -> bool:
     """
     return datetime.utcnow() > expiry_time
 
+# Compiled once at import; \Z anchors without the multiline handling of $
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\Z')
+
 def validate_email(email: str) -> bool:
     """
     Basic email validation.
-    
+
     Args:
         email: Email address to validate
-        
+
     Returns:
         True if valid email format, False otherwise
     """
-    import re
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
 
 def validate_password(password: str) -> Tuple[bool, str]:
     """
@@ -128,14 +141,25 @@ def validate_password(password: str) -> Tuple[bool, str]:
     """
     if len(password) < 8:
         return False, "Password must be at least 8 characters long"
-    
-    if not any(c.isupper() for c in password):
+
+    # Single pass accumulating character-class flags instead of one
+    # iteration per rule
+    flags = 0
+    for c in password:
+        if c.isupper():
+            flags |= 1
+        elif c.islower():
+            flags |= 2
+        elif c.isdigit():
+            flags |= 4
+        if flags == 7:
+            break
+
+    if not flags & 1:
         return False, "Password must contain at least one uppercase letter"
-    
-    if not any(c.islower() for c in password):
+    if not flags & 2:
         return False, "Password must contain at least one lowercase letter"
-    
-    if not any(c.isdigit() for c in password):
+    if not flags & 4:
         return False, "Password must contain at least one digit"
-    
+
     return True, ""
\ No newline at end of file
@@ -0,0 +1,23 @@
+"""
+Utility functions for decoding uploaded face images.
+"""
+import base64
+from typing import Optional
+
+
+def decode_data_url(data_url: str) -> Optional[bytes]:
+    """
+    Decode a base64 data URL (or bare base64 string) to raw image bytes.
+
+    Args:
+        data_url: String like "data:image/jpeg;base64,..." or plain base64
+
+    Returns:
+        Decoded image bytes, or None if the payload is not valid base64
+    """
+    try:
+        if ',' in data_url:
+            data_url = data_url.split(',', 1)[1]
+        return base64.b64decode(data_url)
+    except Exception:
+        return None
@@ -10,7 +10,10 @@ class Config:
     
     # Basic Flask settings
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
-    
+
+    # Logging (debug-level detection tracing is gated behind this)
+    LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'INFO'
+
     # Database
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///face_auth.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
@@ -55,6 +58,7 @@ class ProductionConfig(Config):
     """Production configuration."""
     DEBUG = False
     TESTING = False
+    LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'WARNING'
 
 
 # Configuration dictionary
@@ -1,10 +1,20 @@
 """
 Main Flask application entry point.
 """
-from app import create_app, socketio
+import os
+
+from app import create_app, db, socketio
 
 app = create_app()
 
 if __name__ == '__main__':
-    # Run with SocketIO support
-    socketio.run(app, debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Ensure the schema exists before serving (one-time step, kept out of
+    # create_app so forked workers don't repeat it)
+    with app.app_context():
+        db.create_all()
+
+    # Run with SocketIO support; the debug reloader is single-threaded, so
+    # only enable it in development. Production runs behind an eventlet
+    # gunicorn worker instead of this entry point.
+    debug = os.getenv('FLASK_ENV', 'development') == 'development'
+    socketio.run(app, debug=debug, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -3,10 +3,22 @@
 Startup script for Face Auth application.
 Usage: python run_app.py [--config config_name]
 """
+# eventlet must monkey-patch the stdlib before anything else imports it;
+# with it present, SocketIO serves requests concurrently on green threads
+# instead of the single-threaded Werkzeug dev server
+try:
+    import eventlet
+    eventlet.monkey_patch()
+except ImportError:
+    eventlet = None
 
 import os
 import sys
 import argparse
+
+if eventlet is not None:
+    os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'eventlet')
+
 from app import create_app, db, socketio
 
 
@@ -42,7 +54,12 @@ def main():
         action='store_true',
         help='Enable debug mode'
     )
-    
+    parser.add_argument(
+        '--init-db',
+        action='store_true',
+        help='Create database tables before serving (one-time bootstrap step)'
+    )
+
     args = parser.parse_args()
     
     # Set configuration
@@ -51,23 +68,28 @@ def main():
     try:
         # Create app
         app = create_app(args.config)
-        
-        # Create database tables
-        create_tables(app)
-        
+
+        # Schema creation is a one-time bootstrap (`python run_app.py
+        # --init-db`); normal restarts skip the per-model CREATE TABLE
+        # round-trips. Testing always gets a fresh in-memory schema.
+        if args.init_db or args.config == 'testing':
+            create_tables(app)
+
         print(f"Starting Face Auth application...")
         print(f"Configuration: {args.config}")
         print(f"Debug mode: {args.debug or app.debug}")
         print(f"Server: http://{args.host}:{args.port}")
         print("Press Ctrl+C to stop")
         
-        # Run the application
+        # Run the application; only the Werkzeug fallback needs the
+        # explicit unsafe-server opt-in (development only)
+        run_kwargs = {} if eventlet is not None else {'allow_unsafe_werkzeug': True}
         socketio.run(
             app,
             host=args.host,
             port=args.port,
             debug=args.debug or app.debug,
-            allow_unsafe_werkzeug=True  # For development only
+            **run_kwargs
         )
         
     except KeyboardInterrupt:
@@ -2,30 +2,48 @@
 """
 Simple server startup script for debugging.
 """
+# eventlet must monkey-patch the stdlib before anything else imports it;
+# with it present, SocketIO serves requests concurrently on green threads
+# instead of the single-threaded Werkzeug dev server
+try:
+    import eventlet
+    eventlet.monkey_patch()
+except ImportError:
+    eventlet = None
+
 import os
 import sys
 
+if eventlet is not None:
+    os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'eventlet')
+
 # Add the backend directory to Python path
 backend_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, backend_dir)
 
 try:
-    from app import create_app, socketio
-    
+    from app import create_app, db, socketio
+
     print("Creating Flask app...")
     app = create_app('development')
-    
+
+    # Ensure the schema exists before serving
+    with app.app_context():
+        db.create_all()
+
     print("Starting server on localhost:5000...")
     print("Development mode enabled")
     print("Press Ctrl+C to stop")
     
-    # Run with SocketIO
+    # Run with SocketIO; only the Werkzeug fallback needs the explicit
+    # unsafe-server opt-in
+    run_kwargs = {} if eventlet is not None else {'allow_unsafe_werkzeug': True}
     socketio.run(
         app,
         host='0.0.0.0',  # Listen on all interfaces
         port=5000,
         debug=True,
-        allow_unsafe_werkzeug=True
+        **run_kwargs
     )
     
 except Exception as e:
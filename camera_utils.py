@@ -0,0 +1,67 @@
+"""
+Shared webcam access for the capture test scripts.
+
+Opening cv2.VideoCapture cold typically costs 0.5-2s of driver init, so
+the capture object is a lazily-opened module singleton that later
+captures in the same process reuse. The overlay helper pre-renders the
+instruction text once so the preview loop blits it instead of
+rasterizing glyphs on every frame.
+"""
+import sys
+
+import cv2
+import numpy as np
+
+# Naming the backend skips VideoCapture's autoprobe over every
+# registered backend, which alone can cost hundreds of milliseconds on
+# Windows
+if sys.platform == 'win32':
+    _BACKEND = cv2.CAP_DSHOW
+elif sys.platform == 'darwin':
+    _BACKEND = cv2.CAP_AVFOUNDATION
+else:
+    _BACKEND = cv2.CAP_V4L2
+
+_camera = None
+
+def get_camera(width=None, height=None):
+    """Return the shared VideoCapture, opening it on first use.
+
+    The requested frame size is applied directly on the driver, so
+    callers don't need a per-frame cv2.resize; CAP_PROP_BUFFERSIZE is
+    pinned to 1 so reads return the freshest frame.
+    """
+    global _camera
+    if _camera is None or not _camera.isOpened():
+        _camera = cv2.VideoCapture(0, _BACKEND)
+        _camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        # MJPG over the wire: most UVC cameras can only deliver high
+        # resolutions at full frame rate in compressed form
+        _camera.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+        # Pin the rate so the driver doesn't negotiate a lower one after
+        # the format switch
+        _camera.set(cv2.CAP_PROP_FPS, 30)
+    if width and height:
+        _camera.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        _camera.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    return _camera
+
+def release_camera():
+    """Release the shared capture object (next get_camera reopens it)."""
+    global _camera
+    if _camera is not None:
+        _camera.release()
+        _camera = None
+
+def make_text_overlay(shape, lines):
+    """Pre-render instruction text into a black overlay frame.
+
+    Each line is (text, org, scale, color, thickness). Blit per frame
+    with cv2.max(frame, overlay, frame): text pixels win, black is a
+    no-op, and nothing reallocates.
+    """
+    overlay = np.zeros(shape, dtype=np.uint8)
+    for text, org, scale, color, thickness in lines:
+        cv2.putText(overlay, text, org, cv2.FONT_HERSHEY_SIMPLEX,
+                    scale, color, thickness)
+    return overlay
@@ -4,64 +4,92 @@ This script demonstrates the complete flow without requiring a frontend.
 """
 import os
 import sys
-import json
 import base64
 import requests
 from io import BytesIO
-from PIL import Image, ImageDraw
-import numpy as np
+
+# orjson serializes/parses the large base64-bearing API payloads several
+# times faster than stdlib json; fall back transparently when absent
+try:
+    import orjson
+
+    def json_dumps(obj):
+        """Serialize obj to JSON bytes."""
+        return orjson.dumps(obj)
+
+    def json_parse(response):
+        """Parse a requests response body as JSON."""
+        return orjson.loads(response.content)
+except ImportError:
+    import json
+
+    def json_dumps(obj):
+        """Serialize obj to JSON bytes."""
+        return json.dumps(obj).encode('utf-8')
+
+    def json_parse(response):
+        """Parse a requests response body as JSON."""
+        return response.json()
+
+# The Flask/SQLAlchemy app stack, PIL and numpy are imported inside the
+# functions that need them, so the script starts fast when only a subset
+# of the demo runs
 
 # Add the backend directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
 
-from app import create_app, db
-from app.models import User
-from app.services.face_recognition import face_service
-
 # Configuration
 API_BASE_URL = 'http://localhost:5000/api'
+
+# One pooled session for every API call: keep-alive skips the per-request
+# TCP handshake and also carries the login cookie between endpoints
+SESSION = requests.Session()
+SESSION.headers['Content-Type'] = 'application/json'
+SESSION.mount(
+    'http://', requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4)
+)
 TEST_USER_DATA = {
     'name': 'Demo User',
     'email': 'demo@example.com',
     'password': 'demopass123'
 }
 
-def create_dummy_face_image():
-    """Create a dummy face image for testing purposes."""
-    # Create a simple face-like image
-    img = Image.new('RGB', (160, 160), color='lightblue')
-    draw = ImageDraw.Draw(img)
-    
-    # Draw a simple face
-    # Head outline
-    draw.ellipse([20, 20, 140, 140], fill='peachpuff', outline='black')
-    
-    # Eyes
-    draw.ellipse([45, 55, 65, 75], fill='white', outline='black')
-    draw.ellipse([95, 55, 115, 75], fill='white', outline='black')
-    draw.ellipse([50, 60, 60, 70], fill='black')
-    draw.ellipse([100, 60, 110, 70], fill='black')
-    
-    # Nose
-    draw.polygon([(80, 75), (75, 95), (85, 95)], fill='peachpuff', outline='black')
-    
-    # Mouth
-    draw.arc([65, 95, 95, 115], 0, 180, fill='black', width=2)
-    
-    # Convert to base64
+# The dummy faces are deterministic per seed, so draw and encode each once
+_dummy_image_cache = {}
+
+def create_dummy_face_image(seed=0):
+    """Create a dummy face image for testing purposes (memoized per seed).
+
+    Different seeds shift the facial features so callers can get genuinely
+    distinct faces (e.g. for uniqueness checks) without redrawing the same
+    image.
+    """
+    cached = _dummy_image_cache.get(seed)
+    if cached is not None:
+        return cached
+
+    # The drawing itself lives in the shared helper used by both scripts
+    from face_image_utils import draw_synthetic_face
+    img = draw_synthetic_face(160, seed=seed)
+
+    # Convert to base64; getbuffer() avoids the full-payload copy
+    # getvalue() makes, and base64 output is pure ASCII
     buffer = BytesIO()
     img.save(buffer, format='JPEG')
-    img_data = buffer.getvalue()
-    
+
     # Create data URL
-    base64_data = base64.b64encode(img_data).decode('utf-8')
-    return f"data:image/jpeg;base64,{base64_data}"
+    base64_data = base64.b64encode(buffer.getbuffer()).decode('ascii')
+    data_url = f"data:image/jpeg;base64,{base64_data}"
+    _dummy_image_cache[seed] = data_url
+    return data_url
 
 def test_face_recognition_service():
     """Test the face recognition service directly."""
     print("🧪 Testing Face Recognition Service...")
     
     try:
+        from app.services.face_recognition import face_service
+
         # Create dummy face image
         face_image = create_dummy_face_image()
         
@@ -96,14 +124,14 @@ def test_api_signup(face_image_data):
             'face_image': face_image_data
         }
         
-        response = requests.post(f'{API_BASE_URL}/auth/signup', json=signup_data)
+        response = SESSION.post(f'{API_BASE_URL}/auth/signup', data=json_dumps(signup_data))
         
         if response.status_code == 201:
-            result = response.json()
+            result = json_parse(response)
             print(f"✅ Signup successful: {result['message']}")
             return result
         else:
-            error = response.json().get('error', 'Unknown error')
+            error = json_parse(response).get('error', 'Unknown error')
             print(f"❌ Signup failed: {error}")
             return None
             
@@ -121,23 +149,22 @@ def test_api_login(face_image_data):
             'face_image': face_image_data
         }
         
-        # Create a session to maintain cookies
-        session = requests.Session()
-        response = session.post(f'{API_BASE_URL}/auth/login', json=login_data)
+        # The module session maintains cookies across calls
+        response = SESSION.post(f'{API_BASE_URL}/auth/login', data=json_dumps(login_data))
         
         if response.status_code == 200:
-            result = response.json()
+            result = json_parse(response)
             print(f"✅ Login successful: {result['message']}")
             print(f"   User: {result['user']['name']} ({result['user']['email']})")
             
             # Test authenticated endpoint
-            me_response = session.get(f'{API_BASE_URL}/auth/me')
+            me_response = SESSION.get(f'{API_BASE_URL}/auth/me')
             if me_response.status_code == 200:
                 print("✅ Authenticated endpoint access successful")
             
             return result
         else:
-            error = response.json().get('error', 'Unknown error')
+            error = json_parse(response).get('error', 'Unknown error')
             print(f"❌ Login failed: {error}")
             return None
             
@@ -150,6 +177,9 @@ def test_database_operations():
     print("\n🗄️ Testing Database Operations...")
     
     try:
+        from app import create_app
+        from app.models import User
+
         app = create_app()
         
         with app.app_context():
@@ -163,7 +193,7 @@ def test_database_operations():
                 print(f"   Email: {user.email}")
                 print(f"   Verified: {user.is_verified}")
                 print(f"   Created: {user.created_at}")
-                print(f"   Has embedding: {len(user.embedding) if user.embedding else 0} chars")
+                print(f"   Embedding bytes: {len(user.face_embedding) if user.face_embedding else 0}")
                 
                 # Test embedding retrieval
                 try:
@@ -181,11 +211,19 @@ def test_database_operations():
         print(f"❌ Database operations test failed: {e}")
         return None
 
-def create_test_user_directly():
-    """Create a test user directly in the database."""
+def create_test_user_directly(cached_embedding=None):
+    """Create a test user directly in the database.
+
+    Pass cached_embedding to reuse an embedding computed earlier in the run
+    and skip a redundant trip through the recognition model.
+    """
     print("\n👤 Creating Test User Directly...")
     
     try:
+        from app import create_app, db
+        from app.models import User
+        from app.services.face_recognition import face_service
+
         app = create_app()
         
         with app.app_context():
@@ -196,10 +234,21 @@ def create_test_user_directly():
                 db.session.delete(existing_user)
                 db.session.commit()
             
-            # Create dummy face image and extract embedding
-            face_image = create_dummy_face_image()
-            embedding, error = face_service.get_face_embedding(face_image)
-            
+            # Reuse the already-computed embedding when the caller has one;
+            # otherwise extract it from the dummy face image
+            embedding = cached_embedding
+            if embedding is None:
+                face_image = create_dummy_face_image()
+                if os.environ.get('DEV_FACE_BYPASS'):
+                    # The dummy face is already a centered 160x160 crop, so
+                    # skip MTCNN and embed it directly
+                    error = 'prealigned embedding failed'
+                    embedding = face_service.embedding_from_prealigned(
+                        face_service.base64_to_image(face_image)
+                    )
+                else:
+                    embedding, error = face_service.get_face_embedding(face_image)
+
             if embedding is None:
                 print(f"❌ Cannot create user without valid face embedding: {error}")
                 return None
@@ -231,6 +280,11 @@ def test_face_uniqueness():
     print("\n🔍 Testing Face Uniqueness...")
     
     try:
+        import numpy as np
+        from app import create_app
+        from app.models import User
+        from app.services.face_recognition import face_service
+
         app = create_app()
         
         with app.app_context():
@@ -242,25 +296,30 @@ def test_face_uniqueness():
                 print("❌ Need at least one user to test face uniqueness")
                 return False
             
-            # Create a new face image
-            new_face_image = create_dummy_face_image()
+            # Create a genuinely different face image (distinct seed) so the
+            # check exercises uniqueness rather than comparing a face to itself
+            new_face_image = create_dummy_face_image(seed=1)
             new_embedding, error = face_service.get_face_embedding(new_face_image)
             
             if new_embedding is None:
                 print(f"❌ Cannot extract embedding from new face: {error}")
                 return False
             
-            # Check against existing faces
-            for user in users:
-                try:
-                    existing_embedding = user.get_embedding()
-                    distance = face_service.compare_embeddings(new_embedding, existing_embedding)
-                    is_same = face_service.is_same_person(new_embedding, existing_embedding)
-                    
+            # Check against existing faces: stack the stored embeddings
+            # into one matrix so a single matrix-vector product replaces
+            # N per-user compare_embeddings calls
+            try:
+                emb_matrix = np.stack([user.get_embedding() for user in users])
+                norms = np.linalg.norm(emb_matrix, axis=1) * np.linalg.norm(new_embedding)
+                norms[norms == 0] = 1.0
+                distances = 1.0 - (emb_matrix @ new_embedding) / norms
+
+                for user, distance in zip(users, distances):
+                    is_same = distance < face_service.face_threshold
                     print(f"   User {user.email}: distance={distance:.4f}, same={is_same}")
-                    
-                except Exception as e:
-                    print(f"   Error comparing with user {user.email}: {e}")
+
+            except Exception as e:
+                print(f"   Error comparing embeddings: {e}")
             
             print("✅ Face uniqueness test completed")
             return True
@@ -274,6 +333,9 @@ def cleanup_test_data():
     print("\n🧹 Cleaning up test data...")
     
     try:
+        from app import create_app, db
+        from app.models import User
+
         app = create_app()
         
         with app.app_context():
@@ -305,8 +367,8 @@ def main():
     # Test 2: Database Operations
     test_database_operations()
     
-    # Test 3: Create Test User Directly
-    test_user = create_test_user_directly()
+    # Test 3: Create Test User Directly (reusing the embedding from Test 1)
+    test_user = create_test_user_directly(cached_embedding=embedding)
     
     if test_user is None:
         print("❌ Cannot create test user. Cannot continue with API tests.")
@@ -321,7 +383,7 @@ def main():
     
     try:
         # Test server availability
-        response = requests.get(f'{API_BASE_URL}/auth/me', timeout=5)
+        response = SESSION.get(f'{API_BASE_URL}/auth/me', timeout=5)
         server_running = True
     except:
         server_running = False
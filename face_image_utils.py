@@ -0,0 +1,45 @@
+"""
+Shared synthetic-face drawing for the debug and demo scripts.
+
+Pillow's ellipse/polygon/arc rasterizers are implemented in C, so drawing
+the handful of face shapes directly is far cheaper than computing pixel
+masks in Python or NumPy.
+"""
+
+def draw_synthetic_face(size=160, seed=0):
+    """Draw a simple synthetic face and return it as a PIL image.
+
+    Feature coordinates are defined on a 160x160 grid and scaled to the
+    requested square size. Different seeds shift the eyes and mouth so
+    callers can get visually distinct faces (e.g. for uniqueness checks).
+    """
+    from PIL import Image, ImageDraw
+
+    s = size / 160.0
+    dx = ((seed * 7) % 15) * s
+
+    def box(x0, y0, x1, y1, off=0.0):
+        return [x0 * s + off, y0 * s, x1 * s + off, y1 * s]
+
+    img = Image.new('RGB', (size, size), color='lightblue')
+    draw = ImageDraw.Draw(img)
+
+    # Head outline
+    draw.ellipse(box(20, 20, 140, 140), fill='peachpuff', outline='black')
+
+    # Eyes
+    draw.ellipse(box(45, 55, 65, 75, dx), fill='white', outline='black')
+    draw.ellipse(box(95, 55, 115, 75, dx), fill='white', outline='black')
+    draw.ellipse(box(50, 60, 60, 70, dx), fill='black')
+    draw.ellipse(box(100, 60, 110, 70, dx), fill='black')
+
+    # Nose
+    draw.polygon(
+        [(80 * s, 75 * s), (75 * s, 95 * s), (85 * s, 95 * s)],
+        fill='peachpuff', outline='black'
+    )
+
+    # Mouth
+    draw.arc(box(65, 95, 95, 115, -dx), 0, 180, fill='black', width=2)
+
+    return img
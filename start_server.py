@@ -13,11 +13,15 @@ sys.path.insert(0, backend_dir)
 os.environ['DEV_FACE_BYPASS'] = 'true'
 
 try:
-    from app import create_app, socketio
-    
+    from app import create_app, db, socketio
+
     print("🚀 Starting Face Auth Server...")
     app = create_app('development')
-    
+
+    # Ensure the schema exists before serving
+    with app.app_context():
+        db.create_all()
+
     print("✅ App created successfully")
     print("🔧 Development face bypass: ENABLED")
     print("🌐 Server will start on: http://localhost:5000")
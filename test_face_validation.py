@@ -3,9 +3,12 @@
 Simple test script to verify face validation is working.
 """
 import requests
-import base64
 import json
 
+# Pooled keep-alive session: reused if more checks are added to the script
+SESSION = requests.Session()
+SESSION.headers['Content-Type'] = 'application/json'
+
 def test_face_validation():
     """Test the face validation endpoint with a simple image."""
     
@@ -17,10 +20,9 @@ def test_face_validation():
     
     try:
         # Test the validate-face endpoint
-        response = requests.post(
+        response = SESSION.post(
             'http://localhost:5000/api/auth/validate-face',
-            json={'face_image': test_image_b64},
-            headers={'Content-Type': 'application/json'}
+            json={'face_image': test_image_b64}
         )
         
         print(f"Status Code: {response.status_code}")
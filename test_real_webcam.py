@@ -3,20 +3,96 @@
 Simple test to capture a real webcam image and test face validation.
 Run this script to test with actual camera input.
 """
+import argparse
 import cv2
-import base64
+import os
+import queue
 import requests
 import json
-from PIL import Image
-import io
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-def capture_webcam_image():
-    """Capture an image from webcam."""
+# Quality 85 roughly halves the JPEG versus PIL's default with no
+# visible impact on detection (same setting as the other capture scripts)
+JPEG_QUALITY = 85
+
+from camera_utils import get_camera
+
+# Pooled keep-alive session shared by every API call in the script
+SESSION = requests.Session()
+SESSION.headers['Content-Type'] = 'application/json'
+SESSION.mount(
+    'http://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4)
+)
+
+# Back-to-back invocations (test-harness loops) share one recent health
+# verdict on disk instead of re-probing the server every run
+_HEALTH_CACHE = os.path.join(tempfile.gettempdir(), '.face_auth_health')
+_HEALTH_TTL = 10  # seconds
+
+def _health_cached():
+    """True if a successful health check was recorded within the TTL."""
+    try:
+        with open(_HEALTH_CACHE) as f:
+            return time.time() - float(f.read()) < _HEALTH_TTL
+    except (OSError, ValueError):
+        return False
+
+def _record_health():
+    """Record a successful health check for subsequent runs."""
+    try:
+        with open(_HEALTH_CACHE, 'w') as f:
+            f.write(str(time.time()))
+    except OSError:
+        pass
+
+def _invalidate_health():
+    """Drop the cached verdict so the next run re-probes."""
+    try:
+        os.remove(_HEALTH_CACHE)
+    except OSError:
+        pass
+
+def _grabber(cap, frames, stop):
+    """Producer: keep the freshest decoded frame in the one-slot queue.
+
+    grab() advances the stream every tick so nothing backs up in the
+    driver; the full retrieve() decode still runs on every third frame
+    only, since a ~10 fps preview is plenty for framing a face.
+    """
+    tick = 0
+    while not stop.is_set():
+        if not cap.grab():
+            break
+        tick += 1
+        if tick % 3:
+            continue
+        ret, frame = cap.retrieve()
+        if not ret:
+            break
+        # Drop the stale frame so the slot always holds the newest one
+        try:
+            frames.get_nowait()
+        except queue.Empty:
+            pass
+        frames.put(frame)
+
+def capture_webcam_image(samples=1):
+    """Capture one or more frames from the webcam.
+
+    Returns a list of BGR frames: the one captured on SPACE plus, for
+    samples > 1, the next deliveries from the grabber thread (~100 ms
+    apart), giving a short liveness-style window around the keypress.
+    """
     print("📷 Attempting to capture webcam image...")
     
     try:
-        # Initialize webcam
-        cap = cv2.VideoCapture(0)
+        # Shared camera singleton: explicit backend, no autoprobe. The
+        # 640x480 frame size is set on the driver, so a 1080p camera
+        # never delivers pixels the validation endpoint would throw away
+        cap = get_camera(640, 480)
         
         if not cap.isOpened():
             print("❌ Cannot open webcam")
@@ -25,124 +101,205 @@ def capture_webcam_image():
         print("✅ Webcam opened successfully")
         print("📸 Press SPACE to capture image, ESC to exit")
         
-        while True:
-            ret, frame = cap.read()
-            
-            if not ret:
-                print("❌ Failed to capture frame")
-                break
-            
-            # Display the frame
-            cv2.imshow('Webcam - Press SPACE to capture, ESC to exit', frame)
-            
-            key = cv2.waitKey(1) & 0xFF
-            
-            if key == 32:  # SPACE key
-                print("📸 Image captured!")
-                
-                # Convert BGR to RGB
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Convert to PIL Image
-                pil_image = Image.fromarray(rgb_frame)
+        # Capture runs on its own thread so an imshow or waitKey hiccup
+        # never stalls the camera pipeline; the one-slot queue bounds
+        # preview latency to a single frame
+        frames = queue.Queue(maxsize=1)
+        stop = threading.Event()
+        grabber = threading.Thread(
+            target=_grabber, args=(cap, frames, stop), daemon=True
+        )
+        grabber.start()
+        
+        captured = None
+        try:
+            while True:
+                try:
+                    frame = frames.get(timeout=5)
+                except queue.Empty:
+                    print("❌ Failed to capture frame")
+                    break
                 
-                # Release resources
-                cap.release()
-                cv2.destroyAllWindows()
+                # Display the frame
+                cv2.imshow('Webcam - Press SPACE to capture, ESC to exit', frame)
                 
-                return pil_image
+                # 30 ms covers the UI event pump between ~10 fps frames;
+                # well under human reaction time for SPACE/ESC
+                key = cv2.waitKey(30) & 0xFF
                 
-            elif key == 27:  # ESC key
-                print("🚫 Capture cancelled")
-                break
+                if key == 32:  # SPACE key
+                    print("📸 Image captured!")
+                    # Keep the raw BGR arrays: the JPEG encoder takes
+                    # them directly, so no RGB copy or PIL wrapper is
+                    # needed
+                    captured = [frame]
+                    while len(captured) < samples:
+                        try:
+                            captured.append(frames.get(timeout=5))
+                        except queue.Empty:
+                            break
+                    break
+                    
+                elif key == 27:  # ESC key
+                    print("🚫 Capture cancelled")
+                    break
+        finally:
+            stop.set()
+            grabber.join(timeout=1)
         
-        cap.release()
         cv2.destroyAllWindows()
-        return None
+        return captured
         
     except Exception as e:
         print(f"❌ Webcam capture failed: {e}")
         return None
 
-def test_real_image(image):
-    """Test face validation with real captured image."""
-    if image is None:
+def _encode_frame(frame):
+    """Downscale if needed and JPEG-encode one frame to raw bytes."""
+    # The driver was asked for 640x480 up front, but cap the encoded
+    # size anyway in case the camera ignored the request — JPEG,
+    # base64 and transfer costs all scale with pixel count
+    height, width = frame.shape[:2]
+    if max(height, width) > 640:
+        scale = 640 / max(height, width)
+        frame = cv2.resize(
+            frame, (int(width * scale), int(height * scale)),
+            interpolation=cv2.INTER_AREA
+        )
+    
+    # cv2.imencode consumes the BGR array directly — one pass over
+    # the pixels instead of the cvtColor + PIL + BytesIO round-trip
+    ok, enc = cv2.imencode(
+        '.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), JPEG_QUALITY]
+    )
+    if not ok:
+        raise RuntimeError("JPEG encoding failed")
+    return frame, enc.tobytes()
+
+def _post_validation(img_data):
+    """POST one raw JPEG to the validation endpoint; None on HTTP error.
+
+    Raw JPEG upload: the validate endpoint accepts octet-stream bodies,
+    so the ~33% base64 inflation, the JSON wrapper, and their full-size
+    intermediate copies disappear entirely.
+    """
+    response = SESSION.post(
+        'http://localhost:5000/api/auth/validate-face',
+        data=img_data,
+        headers={'Content-Type': 'application/octet-stream'},
+        timeout=30
+    )
+    print(f"📡 Response status: {response.status_code}")
+    if response.status_code != 200:
+        print(f"❌ API call failed with status {response.status_code}")
+        return None
+    return response.json()
+
+def test_real_image(frames, save_capture=False):
+    """Test face validation with the captured frame(s).
+
+    Several frames go out as concurrent POSTs over the pooled session
+    (there is no server-side batch endpoint), so total network time is
+    bounded by the slowest request instead of the sum, and the verdict
+    is the majority over the samples.
+    """
+    if not frames:
         return False
     
     try:
-        # Save captured image for inspection
-        image.save("captured_face.jpg", "JPEG")
-        print("💾 Saved captured image as 'captured_face.jpg'")
+        encoded = [_encode_frame(f) for f in frames]
         
-        # Convert to base64
-        buffer = io.BytesIO()
-        image.save(buffer, format='JPEG')
-        img_data = buffer.getvalue()
-        img_b64 = base64.b64encode(img_data).decode('utf-8')
-        data_url = f"data:image/jpeg;base64,{img_b64}"
+        if save_capture:
+            # Reuse the already-encoded JPEG bytes and overlap the write
+            # with the HTTP round trip instead of encoding a second time
+            # and blocking on disk before the API call
+            threading.Thread(
+                target=lambda: open('captured_face.jpg', 'wb').write(encoded[0][1]),
+                daemon=True
+            ).start()
+            print("💾 Saving captured image as 'captured_face.jpg'")
         
-        print(f"📊 Image size: {image.size}")
-        print(f"📊 Base64 length: {len(img_b64)} characters")
+        height, width = encoded[0][0].shape[:2]
+        print(f"📊 Image size: {(width, height)}")
+        print(f"📊 JPEG size: {len(encoded[0][1])} bytes x {len(encoded)} frame(s)")
         
         # Test API endpoint
         print("🌐 Testing face validation API...")
         
-        response = requests.post(
-            'http://localhost:5000/api/auth/validate-face',
-            json={'face_image': data_url},
-            headers={'Content-Type': 'application/json'},
-            timeout=30
-        )
-        
-        print(f"📡 Response status: {response.status_code}")
-        print(f"📡 Response body: {response.text}")
-        
-        if response.status_code == 200:
-            result = response.json()
-            if result.get('valid'):
-                print("✅ Real image validation SUCCESSFUL!")
-                return True
-            else:
-                print(f"❌ Real image validation FAILED: {result.get('message')}")
-                return False
+        payloads = [img_data for _, img_data in encoded]
+        if len(payloads) == 1:
+            results = [_post_validation(payloads[0])]
         else:
-            print(f"❌ API call failed with status {response.status_code}")
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(_post_validation, payloads))
+        
+        if any(result is None for result in results):
             return False
+        
+        valid_count = sum(1 for result in results if result.get('valid'))
+        print(f"📡 Frames validated: {valid_count}/{len(results)}")
+        
+        if valid_count * 2 > len(results):
+            print("✅ Real image validation SUCCESSFUL!")
+            return True
+        
+        messages = [r.get('message') for r in results if not r.get('valid')]
+        print(f"❌ Real image validation FAILED: {messages[0]}")
+        return False
             
     except Exception as e:
         print(f"❌ Real image test failed: {e}")
+        _invalidate_health()
         return False
 
 def main():
     """Main test function."""
+    parser = argparse.ArgumentParser(description="Real webcam face validation test")
+    parser.add_argument(
+        '--samples', type=int, default=1, metavar='K',
+        help='validate K frames sampled around the capture (default: 1)'
+    )
+    parser.add_argument(
+        '--save-capture', action='store_true',
+        help="write the captured frame to 'captured_face.jpg' for inspection"
+    )
+    args = parser.parse_args()
+    
     print("🎯 REAL WEBCAM FACE VALIDATION TEST")
     print("=" * 50)
     
-    # Check if backend is running
-    try:
-        response = requests.get('http://localhost:5000/health', timeout=5)
-        if response.status_code == 200:
-            print("✅ Backend server is running")
-        else:
-            print("❌ Backend server not responding correctly")
+    # Check if backend is running; a recent verdict skips the probe
+    if _health_cached():
+        print("✅ Backend server is running (cached)")
+    else:
+        try:
+            response = SESSION.get('http://localhost:5000/health', timeout=5)
+            if response.status_code == 200:
+                print("✅ Backend server is running")
+                _record_health()
+            else:
+                print("❌ Backend server not responding correctly")
+                return
+        except:
+            print("❌ Backend server is not running on localhost:5000")
+            print("   Please start the backend server first")
             return
-    except:
-        print("❌ Backend server is not running on localhost:5000")
-        print("   Please start the backend server first")
-        return
     
-    # Capture webcam image
-    captured_image = capture_webcam_image()
+    # Capture webcam image(s)
+    captured_frames = capture_webcam_image(args.samples)
     
-    if captured_image:
-        # Test with real image
-        success = test_real_image(captured_image)
+    if captured_frames:
+        # Test with real image(s)
+        success = test_real_image(captured_frames, save_capture=args.save_capture)
         
         if success:
             print("\n🎉 SUCCESS: Real webcam image validation worked!")
         else:
             print("\n🚨 FAILED: Real webcam image validation failed")
-            print("   Check the saved 'captured_face.jpg' file")
+            if args.save_capture:
+                print("   Check the saved 'captured_face.jpg' file")
+            else:
+                print("   Re-run with --save-capture to inspect the frame")
             print("   Make sure your face is clearly visible and well-lit")
     else:
         print("\n❌ No image captured")